@@ -65,9 +65,9 @@ Examples:
 """
 
 import dataclasses
-import datetime as dt
 import sys
-from copy import deepcopy
+import time
+from contextlib import nullcontext
 
 import numpy as np
 from S15lib.instruments import TimestampTDC2
@@ -75,8 +75,9 @@ from S15lib.instruments import TimestampTDC2
 import kochen.scriptutil
 import kochen.logging
 
-import S15lib.g2lib.g2lib as g2
-from inst_efficiency.lib.color import nostyle as style, get_style, len_ansi, strip_ansi
+import inst_efficiency.lib.g2lib as g2
+from inst_efficiency.lib.color import nostyle as style, get_style, strip_ansi
+from inst_efficiency.lib.timestamp import PersistentTimestampTDC2
 
 logger = kochen.logging.get_logger(__name__)
 
@@ -84,24 +85,41 @@ logger = kochen.logging.get_logger(__name__)
 INT_MIN = np.iinfo(np.int64).min  # indicate invalid value in int64 array
 
 
+def _hhmmss():
+    """Returns current local time in HHMMSS format, for logging."""
+    return time.strftime("%H%M%S")
+
+
 def print_fixedwidth(*values, width=7, out=None, pbar=None, end="\n"):
     """Prints right-aligned columns of fixed width.
 
+    If 'out' is supplied, the row is also written to the file object
+    with ANSI control chars removed.
+
     Note:
         The default column width of 7 is predicated on the fact that
         10 space-separated columns can be comfortably squeezed into a
         80-width terminal (with an extra buffer for newline depending
         on the shell).
     """
+    # Format both stdout and logfile cells in a single pass
     row = []
+    logrow = []
     for value in values:
         if value == INT_MIN:
             row.append(" " * width)
+            logrow.append(" ".rjust(width))
+            continue
+        value = str(value)
+        if "\x1b" in value:
+            # Pad with length measured with ANSI control chars removed
+            plain = strip_ansi(value)
+            row.append(" " * max(0, width - len(plain)) + value)
+            logrow.append(plain.rjust(width))
         else:
-            # Measure length with ANSI control chars removed
-            value = str(value)
-            slen = max(0, width - len_ansi(value))
-            row.append(" " * slen + value)
+            value = value.rjust(width)
+            row.append(value)
+            logrow.append(value)
     line = " ".join(row)
 
     if pbar:
@@ -109,14 +127,8 @@ def print_fixedwidth(*values, width=7, out=None, pbar=None, end="\n"):
     else:
         print(line, end=end)
     if out:
-        line = " ".join(
-            [
-                f"{strip_ansi(str(value)) if value != INT_MIN else ' ': >{width}s}"
-                for value in values
-            ]
-        )
-        with open(out, "a") as f:
-            f.write(line + "\n")
+        line = " ".join(logrow)
+        out.write(line + "\n")
 
 
 @dataclasses.dataclass(frozen=True)
@@ -126,6 +138,7 @@ class InstEfficiencyArgs:
     tmpfile: str = "/tmp/quick_timestamp"
     threshvolt: float = -0.4
     fast: bool = False
+    persistent: bool = False
 
     script: str | None = None
     time: float = 1.0
@@ -238,35 +251,44 @@ def monitor_singles(params):
     logfile = params.logging
     is_header_logged = False
     i = 0
-    avg = np.array([0, 0, 0, 0])  # averaging facility, e.g. for measuring dark counts
+    avg = np.zeros(4)  # averaging facility, e.g. for measuring dark counts
     avg_iters = 0
-    while True:
-        inttime, counts = read_singles(params)
-
-        # Implement rolling average to avoid overflow
-        if params.average:
-            avg_iters += 1
-            avg = (avg_iters - 1) / avg_iters * avg + np.array(counts) / avg_iters
-            counts = np.round(avg, 1)
-
-        # Print the header line after every 10 lines
-        if i == 0:
-            i = 10
+    # Keep logfile open across iterations, line-buffered for tailing
+    with open(logfile, "a", buffering=1) if logfile else nullcontext() as f:
+        while True:
+            inttime, counts = read_singles(params)
+
+            # Implement rolling average to avoid overflow
+            if params.average:
+                avg_iters += 1
+                scale = 1 / avg_iters
+                avg *= 1 - scale
+                avg += counts * scale
+                counts = avg
+                values = [f"{c:.1f}" for c in counts]
+                # Drop decimal if value does not fit in column, e.g. >= 1e5
+                values = [v if len(v) <= 7 else int(c) for v, c in zip(values, counts)]
+            else:
+                values = list(map(int, counts))
+
+            # Print the header line after every 10 lines
+            if i == 0:
+                i = 10
+                print_fixedwidth(
+                    "TIME", "INTTIME", "CH1", "CH2", "CH3", "CH4", "TOTAL",
+                    out=f if not is_header_logged else None,
+                )  # fmt: skip
+                is_header_logged = True
+            i -= 1
+
+            # Print statistics
             print_fixedwidth(
-                "TIME", "INTTIME", "CH1", "CH2", "CH3", "CH4", "TOTAL",
-                out=logfile if not is_header_logged else None,
-            )  # fmt: skip
-            is_header_logged = True
-        i -= 1
-
-        # Print statistics
-        print_fixedwidth(
-            style(dt.datetime.now().strftime("%H%M%S"), style="dim"),
-            f"{inttime:.2f}",
-            *list(map(int, counts)),
-            style(int(sum(counts)), style="bright"),
-            out=logfile,
-        )
+                style(_hhmmss(), style="dim"),
+                f"{inttime:.2f}",
+                *values,
+                style(int(sum(counts)), style="bright"),
+                out=f,
+            )
 
 
 def read_pairs(params, use_cache=False):
@@ -286,18 +308,12 @@ def read_pairs(params, use_cache=False):
     roffset = params.right
     loffset = params.left
     duration = params.time
-    darkcounts = [
-        params.darkcount1,
-        params.darkcount2,
-        params.darkcount3,
-        params.darkcount4,
-    ]
     channel_start = params.ch_start - 1
     channel_stop = params.ch_stop - 1
     timestamp = params.timestamp
 
-    darkcount_start = darkcounts[channel_start]
-    darkcount_stop = darkcounts[channel_stop]
+    darkcount_start = params.darkcounts[channel_start]
+    darkcount_stop = params.darkcounts[channel_stop]
     window_size = roffset - loffset + 1
     acc_start = max(bins // 2, 1)  # location to compute accidentals
     while True:
@@ -310,7 +326,6 @@ def read_pairs(params, use_cache=False):
             params.tmpfile,
             channel_start=channel_start,
             channel_stop=channel_stop,
-            highres_tscard=True,
             bin_width=bin_width,
             bins=bins,
             # Include window at position 1
@@ -325,8 +340,8 @@ def read_pairs(params, use_cache=False):
             continue
 
         # Calculate statistics
-        acc = window_size * np.mean(hist[acc_start:])
-        pairs = sum(hist[1 : 1 + window_size]) - acc
+        acc = window_size * hist[acc_start:].mean()
+        pairs = hist[1 : 1 + window_size].sum() - acc
 
         # Normalize to per unit second
         s1 = s1 / inttime - darkcount_start  # timestamp data more precise
@@ -370,6 +385,7 @@ def monitor_pairs(params):
     roffset = params.right
     loffset = params.left
     width = params.width
+    bins = params.bins
     hist_verbosity = params.histogram
     logfile = params.logging
 
@@ -382,124 +398,116 @@ def monitor_pairs(params):
         return {"count": 0, "inttime": 0.0, "pairs": 0, "acc": 0, "s1": 0, "s2": 0}
 
     longterm_data = get_longterm_datastruct()
-    while True:
-        hist, inttime, pairs, acc, s1, s2, e1, e2, eavg = read_pairs(params)
-
-        # Visualize g2 histogram
-        HIST_ROWSIZE = 10
-        if hist_verbosity > 1 or (hist_verbosity == 1 and not is_initialized):
-            is_initialized = True
-            a = np.array(hist, dtype=np.int64)
-            # Append NaN values until fits number of rows
-            a = np.append(a, np.resize(INT_MIN, HIST_ROWSIZE - (a.size % HIST_ROWSIZE)))
-            if hist_verbosity > 0:
-                print("\nObtained histogram:")
-                for row in a.reshape(-1, HIST_ROWSIZE):
-                    print_fixedwidth(*row)
-            peakvalue = max(a)
-            peakargmax = np.argmax(a)
-            peakpos = width * (peakargmax + loffset - 1) + peak
-            print(f"Maximum {peakvalue} @ dt = {peakpos}")
-
-            # Display current window as well
-            window_size = roffset - loffset + 1
-            current_window = hist[1 : window_size + 1]
-            print(f"Current window: {list(map(int, current_window))}")
-
-            # Display likely window
-            likely_window = [peakvalue]
-            likely_left = None
-            likely_right = None
-            acc_bin = acc / window_size
-            # Scan below
-            i = 0
-            while True:
-                i += 1
-                pos = peakargmax - i
-                value = a[pos]
-                if value > 2 * acc_bin:
-                    likely_window = [value] + likely_window
-                else:
-                    likely_left = -(i - 1)
-                    break
-            i = 0
-            while True:
-                i += 1
-                pos = peakargmax + i
-                value = a[pos]
-                if value > 2 * acc_bin:
-                    likely_window = likely_window + [value]
-                else:
-                    likely_right = i - 1
-                    break
-            likely_window = a[likely_left + peakargmax : likely_right + 1 + peakargmax]
-            print(f"Likely window: {list(map(int, likely_window))}")
-            print(
-                f"Args: --peak={peakpos} --left={likely_left} --right={likely_right}\n"
-            )
 
-        # Print the header line after every 10 lines
-        if i == 0 or hist_verbosity > 1:
-            i = 10
-            print_fixedwidth(
-                "TIME", "ITIME",
-                "PAIRS", "ACC", "SINGLE1", "SINGLE2",
-                "EFF1", "EFF2", "EFF_AVG",
-                out=logfile if not is_header_logged else None,
-            )  # fmt: skip
-            is_header_logged = True
-        i -= 1
-
-        # Print statistics
-        print_fixedwidth(
-            style(dt.datetime.now().strftime("%H%M%S"), style="dim"),
-            f"{inttime:.2f}",
-            style(int(pairs), style="bright"),
-            f"{acc:.1f}",
-            style(int(s1), fg="yellow", style="bright"),
-            style(int(s2), fg="green", style="bright"),
-            f"{e1:.2f}",
-            f"{e2:.2f}",
-            style(f"{eavg:.2f}", fg="cyan", style="bright"),
-            out=logfile,
-        )
-
-        # Print long-term statistics, only if value supplied
-        if params.avgtime > 0:
-            # Update first
-            longterm_data["count"] += 1
-            longterm_data["inttime"] += inttime
-            longterm_data["pairs"] += pairs
-            longterm_data["acc"] += acc
-            longterm_data["s1"] += s1
-            longterm_data["s2"] += s2
-
-            # Cache long term results if reach threshold
-            if longterm_data["inttime"] >= params.avgtime:
-                counts = longterm_data["count"]
-                inttime = longterm_data["inttime"]
-                p = longterm_data["pairs"] / counts
-                acc = longterm_data["acc"] / counts
-                s1 = longterm_data["s1"] / counts
-                s2 = longterm_data["s2"] / counts
-                prev = (
-                    dt.datetime.now().strftime("%H%M%S"),
-                    round(inttime, 2),
-                    style(int(round(p, 0)), fg="red", style="bright"),
-                    round(acc, 1),
-                    int(round(s1, 0)),
-                    int(round(s2, 0)),
-                    round(100 * p / s2, 1),
-                    round(100 * p / s1, 1),
-                    style(
-                        round(100 * p / (s1 * s2) ** 0.5, 1), fg="red", style="bright"
-                    ),
+    # Histogram display buffer, padded with NaN values until fits number of rows
+    HIST_ROWSIZE = 10
+    a = np.full(bins + HIST_ROWSIZE - (bins % HIST_ROWSIZE), INT_MIN, dtype=np.int64)
+
+    # Keep logfile open across iterations, line-buffered for tailing
+    with open(logfile, "a", buffering=1) if logfile else nullcontext() as f:
+        while True:
+            hist, inttime, pairs, acc, s1, s2, e1, e2, eavg = read_pairs(params)
+
+            # Visualize g2 histogram
+            if hist_verbosity > 1 or (hist_verbosity == 1 and not is_initialized):
+                is_initialized = True
+                np.copyto(a[:bins], hist)
+                if hist_verbosity > 0:
+                    print("\nObtained histogram:")
+                    # Python ints are cheaper to compare and format than numpy scalars
+                    for row in a.reshape(-1, HIST_ROWSIZE).tolist():
+                        print_fixedwidth(*row)
+                peakargmax = int(a.argmax())
+                peakvalue = int(a[peakargmax])
+                peakpos = width * (peakargmax + loffset - 1) + peak
+                print(f"Maximum {peakvalue} @ dt = {peakpos}")
+
+                # Display current window as well
+                window_size = roffset - loffset + 1
+                current_window = hist[1 : window_size + 1]
+                print(f"Current window: {list(map(int, current_window))}")
+
+                # Display likely window, i.e. contiguous bins around peak
+                # above twice the accidentals. Padded INT_MIN values bound
+                # the window to the histogram.
+                acc_bin = acc / window_size
+                below = np.flatnonzero(a <= 2 * acc_bin)
+                left = below[below < peakargmax]
+                right = below[below > peakargmax]
+                likely_left = -(peakargmax - left[-1] - 1) if left.size else -peakargmax
+                likely_right = right[0] - peakargmax - 1
+                likely_window = a[
+                    likely_left + peakargmax : likely_right + 1 + peakargmax
+                ]
+                print(f"Likely window: {list(map(int, likely_window))}")
+                print(
+                    f"Args: --peak={peakpos} --left={likely_left} --right={likely_right}\n"
                 )
-                longterm_data = get_longterm_datastruct()  # reset counts
 
-            # Print if exists
-            if prev:
-                print_fixedwidth(*prev, end="\r")
+            # Print the header line after every 10 lines
+            if i == 0 or hist_verbosity > 1:
+                i = 10
+                print_fixedwidth(
+                    "TIME", "ITIME",
+                    "PAIRS", "ACC", "SINGLE1", "SINGLE2",
+                    "EFF1", "EFF2", "EFF_AVG",
+                    out=f if not is_header_logged else None,
+                )  # fmt: skip
+                is_header_logged = True
+            i -= 1
+
+            # Print statistics
+            print_fixedwidth(
+                style(_hhmmss(), style="dim"),
+                f"{inttime:.2f}",
+                style(int(pairs), style="bright"),
+                f"{acc:.1f}",
+                style(int(s1), fg="yellow", style="bright"),
+                style(int(s2), fg="green", style="bright"),
+                f"{e1:.2f}",
+                f"{e2:.2f}",
+                style(f"{eavg:.2f}", fg="cyan", style="bright"),
+                out=f,
+            )
+
+            # Print long-term statistics, only if value supplied
+            if params.avgtime > 0:
+                # Update first
+                longterm_data["count"] += 1
+                longterm_data["inttime"] += inttime
+                longterm_data["pairs"] += pairs
+                longterm_data["acc"] += acc
+                longterm_data["s1"] += s1
+                longterm_data["s2"] += s2
+
+                # Cache long term results if reach threshold
+                if longterm_data["inttime"] >= params.avgtime:
+                    counts = longterm_data["count"]
+                    inttime = longterm_data["inttime"]
+                    p = longterm_data["pairs"] / counts
+                    acc = longterm_data["acc"] / counts
+                    s1 = longterm_data["s1"] / counts
+                    s2 = longterm_data["s2"] / counts
+                    prev = (
+                        _hhmmss(),
+                        round(inttime, 2),
+                        style(int(round(p, 0)), fg="red", style="bright"),
+                        round(acc, 1),
+                        int(round(s1, 0)),
+                        int(round(s2, 0)),
+                        round(100 * p / s2, 1),
+                        round(100 * p / s1, 1),
+                        style(
+                            round(100 * p / (s1 * s2) ** 0.5, 1),
+                            fg="red",
+                            style="bright",
+                        ),
+                    )
+                    longterm_data = get_longterm_datastruct()  # reset counts
+
+                # Print if exists
+                if prev:
+                    print_fixedwidth(*prev, end="\r")
 
 
 def read_2pairs(params):
@@ -534,34 +542,36 @@ def monitor_2pairs(params):
     logfile = params.logging
     is_header_logged = False
     i = 0
-    while True:
-        p1, a1, s11, s12, p2, a2, s21, s22 = read_2pairs(params)
-
-        # Print the header line after every 10 lines
-        if i == 0:
-            i = 10
+    # Keep logfile open across iterations, line-buffered for tailing
+    with open(logfile, "a", buffering=1) if logfile else nullcontext() as f:
+        while True:
+            p1, a1, s11, s12, p2, a2, s21, s22 = read_2pairs(params)
+
+            # Print the header line after every 10 lines
+            if i == 0:
+                i = 10
+                print_fixedwidth(
+                    "TIME",
+                    "P1", "A1", "S11", "S12",
+                    "P2", "A2", "S21", "S22",
+                    out=f if not is_header_logged else None,
+                )  # fmt: skip
+                is_header_logged = True
+            i -= 1
+
+            # Print statistics
             print_fixedwidth(
-                "TIME",
-                "P1", "A1", "S11", "S12",
-                "P2", "A2", "S21", "S22",
-                out=logfile if not is_header_logged else None,
-            )  # fmt: skip
-            is_header_logged = True
-        i -= 1
-
-        # Print statistics
-        print_fixedwidth(
-            style(dt.datetime.now().strftime("%H%M%S"), style="dim"),
-            style(int(p1), fg="yellow", style="bright"),
-            style(round(a1, 1), style="bright"),
-            int(s11),
-            int(s12),
-            style(int(p2), fg="green", style="bright"),
-            style(round(a2, 1), style="bright"),
-            int(s21),
-            int(s22),
-            out=logfile,
-        )
+                style(_hhmmss(), style="dim"),
+                style(int(p1), fg="yellow", style="bright"),
+                style(round(a1, 1), style="bright"),
+                int(s11),
+                int(s12),
+                style(int(p2), fg="green", style="bright"),
+                style(round(a2, 1), style="bright"),
+                int(s21),
+                int(s22),
+                out=f,
+            )
 
 
 @_collect_as_script("visibility")
@@ -577,10 +587,12 @@ def print_2pairs(params):
 
 
 def duplicate_args(args):
-    """Makes a copy of the argparse.Namespace object."""
-    attrs = vars(args)
-    attrs_copy = {k: deepcopy(v) for k, v in attrs.items()}
-    return type(args)(**attrs_copy)
+    """Makes a shallow copy of the argparse.Namespace object.
+
+    Attribute values are shared, notably the timestamp instrument, so only
+    reassign attributes on the copy instead of mutating them in-place.
+    """
+    return type(args)(**vars(args))
 
 
 def main():
@@ -632,6 +644,9 @@ def main():
         pgroup.add_argument(
             "-f", "--fast", action="store_true",
             help="[TDC2] Enable fast event readout mode, i.e. 32-bit wide events.")
+        pgroup.add_argument(
+            "--persistent", action="store_true",
+            help=adv("Keep a single readevents process running across measurements"))
 
         # Script-level arguments
         pgroup = parser.add_argument_group("global configuration")
@@ -731,11 +746,15 @@ def main():
         return PROGRAMS[args.script](args)
     except KeyboardInterrupt:
         pass
+    finally:
+        if args.persistent:
+            args.timestamp.close()
 
 
 def postprocess_args(args):
     # Initialize timestamp
-    timestamp = TimestampTDC2(
+    timestamp_cls = PersistentTimestampTDC2 if args.persistent else TimestampTDC2
+    timestamp = timestamp_cls(
         device_path=args.device,
         readevents_path=args.readevents,
         outfile_path=args.tmpfile,
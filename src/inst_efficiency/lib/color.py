@@ -1,3 +1,4 @@
+import functools
 import re
 
 RE_ANSIESCAPE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
@@ -27,20 +28,9 @@ def nostyle(text, *args, **kwargs):
     return text
 
 
-def style(text, fg=None, bg=None, style=None, clear=False, up=0):
-    """Returns text with ANSI wrappers for each line.
-
-    Special note on newlines, where lines are broken up to apply
-    formatting on individual lines, excluding the newline character.
-
-    Position of start of print can be controlled using the 'up' arg.
-
-    Usage:
-        >>> print(s("hello\nworld", fg="red", style="dim"))
-        hello
-        world
-    """
-    # Construct formatting
+@functools.lru_cache(maxsize=None)
+def _get_format(fg=None, bg=None, style=None, clear=False):
+    """Returns ANSI prefix for the formatting, cached for repeated styles."""
     fmt = ""
     for c, cls in zip((fg, bg), (colorama.Fore, colorama.Back)):
         if c:
@@ -54,11 +44,32 @@ def style(text, fg=None, bg=None, style=None, clear=False, up=0):
     # Force clear lines
     if clear:
         fmt = colorama.ansi.clear_line() + fmt
+    return fmt
+
+
+def style(text, fg=None, bg=None, style=None, clear=False, up=0):
+    """Returns text with ANSI wrappers for each line.
+
+    Special note on newlines, where lines are broken up to apply
+    formatting on individual lines, excluding the newline character.
+
+    Position of start of print can be controlled using the 'up' arg.
+
+    Usage:
+        >>> print(s("hello\nworld", fg="red", style="dim"))
+        hello
+        world
+    """
+    fmt = _get_format(fg, bg, style, clear)
 
     # Break by individual lines to apply formatting
-    lines = str(text).split("\n")
-    lines = [f"{fmt}{line}{colorama.Style.RESET_ALL}" for line in lines]
-    text = "\n".join(lines)
+    text = str(text)
+    if "\n" not in text:
+        text = f"{fmt}{text}{colorama.Style.RESET_ALL}"
+    else:
+        lines = text.split("\n")
+        lines = [f"{fmt}{line}{colorama.Style.RESET_ALL}" for line in lines]
+        text = "\n".join(lines)
 
     # Apply move and restore position
     # Assuming Cursor.DOWN will stop at bottom of current terminal printing
@@ -69,9 +80,15 @@ def style(text, fg=None, bg=None, style=None, clear=False, up=0):
 
 
 def strip_ansi(text):
+    # Skip regex for plain text, i.e. most values
+    if "\x1b" not in text:
+        return text
     return RE_ANSIESCAPE.sub("", text)
 
 
 def len_ansi(text):
     """Returns length after removing ANSI codes."""
-    return len(strip_ansi(text))
+    text = str(text)
+    if "\x1b" not in text:
+        return len(text)
+    return len(RE_ANSIESCAPE.sub("", text))
@@ -0,0 +1,187 @@
+"""Coincidence histogramming for timestamp files.
+
+Local replacement for 'S15lib.g2lib.g2lib.g2_extr', restricted to the
+high resolution TDC2 timestamp format used by this script. The pair scan
+in S15lib's 'delta_loop' runs per-event in Python when its Cython module
+is unavailable, which dominates the runtime of 'read_pairs'.
+"""
+
+import functools
+import os
+
+import numpy as np
+from fpfind.lib.constants import TSRES
+from fpfind.lib.parse_timestamps import read_a1
+from numba import get_num_threads, njit, prange
+
+TICKS_PER_NS = TSRES.PS4.value  # native 4ps resolution of TDC2 timestamps
+L2_CACHE_BYTES = 1 << 20  # assumed per-core L2 cache size, for tiling
+
+# Lookup table of 4-bit detector pattern -> whether channel is present,
+# stored channel-major so each channel row is contiguous
+_CHMASK = np.array(
+    [[(code >> ch) & 1 for code in range(16)] for ch in range(4)], dtype=bool
+)
+
+
+@njit(cache=True, parallel=True, fastmath=True)
+def _delta_hist(t1, t2, bin_width, bins, nchunks, blocksize):
+    """Two-pointer walk over start/stop events, see 'delta_hist'.
+
+    Stop events are split into 'nchunks' contiguous chunks, one per
+    thread, each accumulating into its own histogram row. Each chunk
+    is further tiled into blocks of 'blocksize' stop events to stay
+    resident in cache, with only start events within the time span
+    of the block walked over.
+    """
+    hi = bins * bin_width
+    chunksize = (t2.size + nchunks - 1) // nchunks
+    hists = np.zeros((nchunks, bins), dtype=np.int64)
+    for c in prange(nchunks):
+        cstart = c * chunksize
+        cend = min(cstart + chunksize, t2.size)
+        for bstart in range(cstart, cend, blocksize):
+            bend = min(bstart + blocksize, cend)
+            istart = np.searchsorted(t1, t2[bstart] - hi, side="right")
+            iend = np.searchsorted(t1, t2[bend - 1], side="right")
+            j = bstart
+            for i in range(istart, iend):
+                ts = t1[i]
+                while j < bend and t2[j] < ts:
+                    j += 1
+                k = j
+                while k < bend:
+                    d = t2[k] - ts
+                    if d >= hi:
+                        break
+                    b = int(d // bin_width)
+                    if b < bins:
+                        hists[c, b] += 1
+                    k += 1
+    return hists.sum(axis=0)
+
+
+def delta_hist(t1, t2, bins, bin_width):
+    """Returns histogram of time differences 't2 - t1' in '[0, bins*bin_width)'.
+
+    Both 't1' and 't2' are assumed to be sorted. Only the slice of 't2'
+    falling within the histogram window of each start event is extracted,
+    so the cost scales with the number of coincidences instead of the
+    product of the number of events.
+    """
+    blocksize = max(L2_CACHE_BYTES // 2 // t2.itemsize, 1)
+    return _delta_hist(t1, t2, bin_width, bins, get_num_threads(), blocksize)
+
+
+def _delta_hist_numpy(t1, t2, bin_width, bins):
+    """Pure NumPy reference for 'delta_hist', for checking the Numba kernel.
+
+    Not used by 'g2_extr'. Temporary arrays scale with the number of
+    coincidences, so this is only suitable for small inputs.
+    """
+    hi = bins * bin_width
+    j0 = np.searchsorted(t2, t1)
+    j1 = np.searchsorted(t2, t1 + hi)
+    counts = j1 - j0
+    total = counts.sum()
+    if total == 0:
+        return np.zeros(bins, dtype=np.int64)
+
+    # Gather all (start, stop) pairs within window, i.e. 't2[j0[i]:j1[i]] - t1[i]'
+    offsets = np.repeat(j0 - (np.cumsum(counts) - counts), counts)
+    deltas = t2[offsets + np.arange(total)] - np.repeat(t1, counts)
+
+    # Deltas are integer ticks, so bin exactly without floating point edges
+    return np.bincount(deltas // bin_width, minlength=bins)[:bins]
+
+
+@functools.lru_cache(maxsize=2)
+def _read_cached(filename, mtime_ns, size):
+    """Returns parsed timestamps, cached by file modification time and size.
+
+    Cached arrays are shared between callers, so are marked read-only.
+    """
+    # Raw timestamps are uint64 with at most 54-bit precision, view as int64
+    t, p = read_a1(
+        filename,
+        legacy=True,
+        resolution=TSRES.PS4,
+        fractional=False,
+        ignore_rollover=True,
+    )
+    t = t.view(np.int64)
+    t.setflags(write=False)
+    p.setflags(write=False)
+    return t, p
+
+
+@functools.lru_cache(maxsize=8)
+def _read_channel_cached(filename, mtime_ns, size, channel):
+    """Returns timestamps of a single channel, see '_read_cached'."""
+    t, p = _read_cached(filename, mtime_ns, size)
+    tc = t.take(np.flatnonzero(_CHMASK[channel][p]))  # patterns already 4-bit
+    tc.setflags(write=False)
+    return tc
+
+
+def g2_extr(
+    filename: str,
+    bins: int = 100,
+    bin_width: float = 2,
+    min_range: float = 0,
+    channel_start: int = 0,
+    channel_stop: int = 1,
+    c_stop_delay: float = 0,
+):
+    """Generates g2 histogram from a raw timestamp file.
+
+    Drop-in for 'S15lib.g2lib.g2lib.g2_extr' with 'highres_tscard=True'.
+
+    Args:
+        filename: Timestamp file containing raw data.
+        bins: Number of bins for the coincidence histogram.
+        bin_width: Bin width of coincidence histogram, in ns.
+        min_range: Lower range of correlation, in ns.
+        channel_start: Channel of start events, from 0 to 3.
+        channel_stop: Channel of stop events, from 0 to 3.
+        c_stop_delay: Time added to the stop channel timestamps, in ns.
+
+    Raises:
+        ValueError: When channel is not between 0 - 3.
+        RuntimeError: When no timestamps events are in specified channels.
+
+    Returns:
+        Tuple of histogram, time differences, events in channel_start,
+        events in channel_stop, and time at last event.
+
+    Note:
+        Timestamps are kept as integer ticks of the timestamp card, so
+        'bin_width', 'min_range' and 'c_stop_delay' are rounded to the
+        nearest 4ps tick.
+    """
+    if channel_start not in range(4):
+        raise ValueError("Selected start channel not in range")
+    if channel_stop not in range(4):
+        raise ValueError("Selected stop channel not in range")
+
+    # Reuse parsed file if unchanged, e.g. multiple channel pairs
+    stat = os.stat(filename)
+    key = (filename, stat.st_mtime_ns, stat.st_size)
+    t, _ = _read_cached(*key)
+    t1 = _read_channel_cached(*key, channel_start)
+    t2 = _read_channel_cached(*key, channel_stop)
+    if t1.size == 0 and t2.size == 0:
+        raise RuntimeError(
+            "No timestamp events recorded in channels "
+            f"{channel_start+1} and {channel_stop+1}."
+        )
+
+    # Convert to units of ticks
+    bw_ticks = max(int(round(bin_width * TICKS_PER_NS)), 1)
+    offset_ticks = int(round((c_stop_delay - min_range) * TICKS_PER_NS))
+
+    t2s = t2 + offset_ticks
+    hist = delta_hist(t1, t2s, bins, bw_ticks)
+    t_max = (t[-1] - t[0]) / TICKS_PER_NS if t.size else 0
+    dt = np.arange(bins) * bin_width + min_range
+    return hist, dt, t1.size, t2.size, t_max
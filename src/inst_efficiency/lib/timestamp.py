@@ -0,0 +1,202 @@
+"""Timestamp interface with a single long-running readevents process.
+
+'TimestampTDC2' spawns a new 'readevents' process for every measurement,
+whose startup dominates short integration times. The subclass here keeps
+a single 'readevents -a1 -X' process streaming into a pipe for the
+lifetime of the program, and cuts the stream by event time for each
+measurement.
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import psutil
+from fpfind.lib.constants import TSRES
+from fpfind.lib.parse_timestamps import read_a1_from_buffer
+from S15lib.instruments import TimestampTDC2
+
+EVENT_BYTES = 8  # size of a single a1 event
+TICKS_PER_S = TSRES.PS4.value * 1_000_000_000  # 4ps timestamp ticks per second
+STARTUP_TIMEOUT = 2.0  # maximum wait for readevents stream to start, in seconds
+STREAM_TIMEOUT = 5.0  # maximum wait for events beyond measurement, in seconds
+POLL_INTERVAL = 0.01  # interval between checks of buffered events, in seconds
+PEEK_EVENTS = 64  # events parsed at each end of buffer when polling
+
+
+def _parse(data):
+    """Returns timestamps in 4ps ticks, and mask of non-rollover events."""
+    t, _ = read_a1_from_buffer(
+        data, legacy=True, resolution=TSRES.PS4, fractional=False
+    )
+    low_words = np.frombuffer(data, dtype="<u4")[1::2]  # swapped in legacy format
+    return t, (low_words & 0b10000) == 0
+
+
+class PersistentTimestampTDC2(TimestampTDC2):
+    """TimestampTDC2 streaming from a persistent readevents process.
+
+    The stream is only started on the first measurement, and should be
+    terminated with 'close'. Events are written to 'outfile_path' for each
+    measurement, so downstream readers of the file remain unchanged.
+
+    Each measurement spans 'duration' in event time, starting from the
+    first buffered event. Events after the cut are kept for the next
+    measurement, so back-to-back measurements are contiguous. Buffered
+    events are discarded if no measurement follows within 'duration'.
+
+    Note:
+        The stream is always read in the legacy a1 format ('-X'), so
+        readevents arguments passed to '_call_with_duration' are ignored.
+        Timestamp configuration changes do not apply to a running stream.
+
+        readevents does not flush its output, so events arrive in blocks
+        of 512 events. If no block arrives within 'STREAM_TIMEOUT' after
+        the measurement duration, e.g. at very low event rates, all
+        events buffered so far are returned instead.
+    """
+
+    STREAM_ARGS = ["-a1", "-X"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._legacy = True  # match stream format for 'get_counts'
+        self._process = None
+        self._stream = None
+        self._thread = None
+        self._started = threading.Event()  # set when first events are received
+        self._lock = threading.Lock()
+        self._buffer = bytearray()
+        self._recording = False
+        self._expiry = None  # time after which buffered events are stale
+        self._position = 0  # number of bytes read from stream
+        self._skip = 0  # bytes to skip in buffer to align to event boundary
+
+    def _start(self):
+        """Starts readevents, writing into a pipe drained by a thread."""
+        self._clear_buffer()
+
+        # Reuse '_call' to construct readevents command, by opening the
+        # reading end of a named pipe first so that '_call' does not block
+        tmpdir = tempfile.mkdtemp()
+        fifo = os.path.join(tmpdir, "events")
+        try:
+            os.mkfifo(fifo)
+            rfd = os.open(fifo, os.O_RDONLY | os.O_NONBLOCK)
+            self._process, wfd = self._call(self.STREAM_ARGS, target_file=fifo)
+            os.close(wfd)
+        finally:
+            if os.path.exists(fifo):
+                os.unlink(fifo)
+            os.rmdir(tmpdir)
+        os.set_blocking(rfd, True)
+        self._stream = os.fdopen(rfd, "rb", buffering=0)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+        self._started.wait(timeout=STARTUP_TIMEOUT)
+
+    def _drain(self):
+        while True:
+            data = self._stream.read(65536)
+            if not data:
+                break
+            with self._lock:
+                self._expire()
+                if self._recording:
+                    self._buffer += data
+                self._position += len(data)
+            self._started.set()
+
+    def _expire(self):
+        """Stops recording if buffered events are stale, with lock held."""
+        if self._expiry is not None and time.monotonic() > self._expiry:
+            self._recording = False
+            self._buffer.clear()
+
+    def _peek(self, span):
+        """Returns whether buffered events span at least 'span' ticks."""
+        with self._lock:
+            nevents = max(len(self._buffer) - self._skip, 0) // EVENT_BYTES
+            end = self._skip + nevents * EVENT_BYTES
+            nbytes = min(nevents, PEEK_EVENTS) * EVENT_BYTES
+            head = bytes(self._buffer[self._skip : self._skip + nbytes])
+            tail = bytes(self._buffer[end - nbytes : end])
+        t0, v0 = _parse(head)
+        t1, v1 = _parse(tail)
+        return v0.any() and v1.any() and t1[v1][-1] >= t0[v0][0] + np.uint64(span)
+
+    def _cut(self, span=None):
+        """Removes and returns buffered events spanning 'span' ticks.
+
+        All buffered events are returned if 'span' is None.
+        """
+        with self._lock:
+            data = self._buffer[self._skip :]
+            data = data[: len(data) - (len(data) % EVENT_BYTES)]
+            if not data:
+                return data
+            if span is not None:
+                t, valid = _parse(data)
+                idx = np.flatnonzero(valid)
+                tv = t[idx]
+                # Cut at first event at or after end of window
+                i = np.searchsorted(tv, tv[0] + np.uint64(span))
+                data = data[: idx[i] * EVENT_BYTES]
+            del self._buffer[: self._skip + len(data)]
+            self._skip = 0
+        return data
+
+    def _call_with_duration(self, args, target_file="", duration=1, **kwargs):
+        """Writes events from the stream over 'duration' seconds into file.
+
+        Args:
+            args: Ignored, see class documentation.
+            target_file: Path to local storage to store timestamp event data.
+            duration: Time to record events, in seconds.
+        """
+        if self._process is None:
+            self._start()
+        if self._process.poll() is not None:
+            emsg = self._process.stderr.read1(100)
+            raise RuntimeError(f"readevents terminated unexpectedly: {emsg}")
+
+        # Resume from events left over from previous measurement, if any
+        with self._lock:
+            self._expire()
+            self._expiry = None
+            if not self._recording:
+                self._buffer.clear()
+                self._skip = -self._position % EVENT_BYTES
+                self._recording = True
+
+        # Wait until buffered events span the measurement duration
+        span = int(round(duration * TICKS_PER_S))
+        deadline = time.monotonic() + duration + STREAM_TIMEOUT
+        while not self._peek(span):
+            if time.monotonic() > deadline:
+                span = None  # return everything buffered
+                break
+            time.sleep(POLL_INTERVAL)
+        data = self._cut(span)
+        with self._lock:
+            self._expiry = time.monotonic() + duration
+
+        if not target_file:
+            target_file = self.outfile_path
+        with open(target_file, "wb") as f:
+            f.write(data)
+
+    def close(self):
+        """Terminates the readevents process, if started."""
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.terminate()
+        _, alive = psutil.wait_procs([self._process], timeout=0.5)
+        for p in alive:
+            p.kill()
+        self._thread.join(timeout=1)  # drains until end of stream
+        self._stream.close()
+        self._process = None